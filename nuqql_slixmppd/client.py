@@ -3,10 +3,11 @@ slixmppd backend client
 """
 
 import logging
+import ssl
 import time
 import unicodedata
 
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
 
 # slixmpp
 from slixmpp import ClientXMPP  # type: ignore
@@ -25,6 +26,44 @@ if TYPE_CHECKING:   # imports for typing
 VERSION = "0.4"
 
 
+class ControlCharTable(dict):
+    """
+    Translation table for str.translate() that removes control characters,
+    i.e., characters in unicode category "C", except the characters in keep.
+    The category of each character is only looked up once and then cached.
+    """
+
+    def __init__(self, keep: str = "") -> None:
+        super().__init__()
+        self.keep = {ord(ch) for ch in keep}
+
+    def __missing__(self, code: int) -> Optional[int]:
+        value: Optional[int] = code
+        if code not in self.keep and \
+                unicodedata.category(chr(code))[0] == "C":
+            value = None
+        self[code] = value
+        return value
+
+
+# translation tables for removing control characters from messages
+MSG_CONTROL_CHARS = ControlCharTable(keep="\n")
+HTML_CONTROL_CHARS = ControlCharTable()
+
+# slixmpp plugins registered for each client
+PLUGINS = (
+    'xep_0071',     # XHTML-IM
+    'xep_0082',     # XMPP Date and Time Profiles
+    'xep_0203',     # Delayed Delivery, time stamps
+    'xep_0030',     # Service Discovery
+    'xep_0045',     # Multi-User Chat
+    'xep_0199',     # XMPP Ping
+)
+
+# ssl context shared by all clients
+SSL_CONTEXT = ssl.create_default_context()
+
+
 class BackendClient(ClientXMPP):
     """
     Backend Client Class, derived from Slixmpp Client,
@@ -38,6 +77,14 @@ class BackendClient(ClientXMPP):
         self.account = account
         self.account.status = "offline"     # set "online" in session_start()
 
+        # use shared ssl context instead of a separate one per client
+        self.ssl_context = SSL_CONTEXT
+
+        # plugins
+        for plugin in PLUGINS:
+            self.register_plugin(plugin)
+        self._muc = self.plugin['xep_0045']
+
         # event handlers
         self.add_event_handler("session_start", self._session_start)
         self.add_event_handler("disconnected", self._disconnected)
@@ -49,7 +96,7 @@ class BackendClient(ClientXMPP):
         self.shutdown = False
 
         self.muc_invites: Dict[str, Tuple[str, str]] = {}
-        self.muc_cache: List[str] = []
+        self.muc_cache: Set[str] = set()
 
     def _session_start(self, _event) -> None:
         """
@@ -78,6 +125,20 @@ class BackendClient(ClientXMPP):
             # not shutting down -> reconnect
             self.connect()
 
+    @staticmethod
+    def _get_timestamp(msg) -> int:
+        """
+        Get timestamp of message in seconds
+        """
+
+        # if message contains a timestamp, use it
+        stamp = msg['delay']['stamp']
+        if stamp:
+            return int(stamp.timestamp())
+
+        # if there is no timestamp in message, use current time
+        return int(time.time())
+
     def message(self, msg) -> None:
         """
         Message handler
@@ -89,17 +150,8 @@ class BackendClient(ClientXMPP):
                 # TODO: add special handling?
                 return
 
-            # if message contains a timestamp, use it
-            tstamp = msg['delay']['stamp']
-            if tstamp:
-                # convert to timestamp in seconds
-                tstamp = tstamp.timestamp()
-            else:
-                # if there is no timestamp in message, use current time
-                tstamp = time.time()
-
             # save timestamp and message in messages list and history
-            tstamp = int(tstamp)
+            tstamp = self._get_timestamp(msg)
             formatted_msg = Message.message(
                 self.account, tstamp, msg["from"], msg["to"], msg["body"])
             self.account.receive_msg(formatted_msg)
@@ -115,7 +167,7 @@ class BackendClient(ClientXMPP):
             # filter own messages
             chat = msg['from'].bare
             sender = msg['mucnick']
-            nick = self.plugin['xep_0045'].our_nicks[chat]
+            nick = self._muc.our_nicks[chat]
             if self.account.config.get_filter_own() and sender == nick:
                 return
 
@@ -123,17 +175,8 @@ class BackendClient(ClientXMPP):
             if sender == nick:
                 sender = "<self>"
 
-            # if message contains a timestamp, use it
-            tstamp = msg['delay']['stamp']
-            if tstamp:
-                # convert to timestamp in seconds
-                tstamp = tstamp.timestamp()
-            else:
-                # if there is no timestamp in message, use current time
-                tstamp = time.time()
-
             # save timestamp and message in messages list and history
-            tstamp = int(tstamp)
+            tstamp = self._get_timestamp(msg)
             formatted_msg = Message.chat_msg(
                 self.account, tstamp, sender, chat, msg["body"])
             self.account.receive_msg(formatted_msg)
@@ -145,7 +188,7 @@ class BackendClient(ClientXMPP):
 
         # get chat and our nick in the chat
         chat = presence["from"].bare
-        nick = self.plugin['xep_0045'].our_nicks[chat]
+        nick = self._muc.our_nicks[chat]
         if presence['muc']['nick'] == "" and presence["muc"]["role"] == "":
             return
 
@@ -186,12 +229,13 @@ class BackendClient(ClientXMPP):
 
         # create message from message tuple and send it
         jid, msg, html_msg, mtype = message_tuple
-        # remove control characters from message
+        # remove control characters from message; printable strings do not
+        # contain any, so only translate the others
         # TODO: do it in based/for all backends?
-        msg = "".join(ch for ch in msg if ch == "\n" or
-                      unicodedata.category(ch)[0] != "C")
-        html_msg = "".join(ch for ch in html_msg if
-                           unicodedata.category(ch)[0] != "C")
+        if not msg.isprintable():
+            msg = msg.translate(MSG_CONTROL_CHARS)
+        if not html_msg.isprintable():
+            html_msg = html_msg.translate(HTML_CONTROL_CHARS)
         self.send_message(mto=jid, mbody=msg, mhtml=html_msg, mtype=mtype)
 
     async def handle_command(self, cmd: Callback, params: Tuple) -> None:
@@ -226,9 +270,13 @@ class BackendClient(ClientXMPP):
         """
 
         # get buddies from roster
-        for jid in self.client_roster.keys():
-            alias = self.client_roster[jid]["name"]
-            connections = self.client_roster.presence(jid)
+        roster = self.client_roster
+        joined_rooms = set(self._muc.get_joined_rooms())
+        for jid in roster.keys():
+            # look up roster item once and use it for alias and presence
+            item = roster[jid]
+            alias = item["name"]
+            connections = item.resources
             status = "offline"
 
             # check all resources for presence information
@@ -245,7 +293,7 @@ class BackendClient(ClientXMPP):
                     status = pres['show']
 
             # check if it is a muc
-            if jid in self.plugin['xep_0045'].get_joined_rooms():
+            if jid in joined_rooms:
                 # use special status for group chats
                 status = "GROUP_CHAT"
             elif jid in self.muc_cache:
@@ -309,11 +357,13 @@ class BackendClient(ClientXMPP):
         List active chats of account
         """
 
-        for chat in self.plugin['xep_0045'].get_joined_rooms():
+        account = self.account
+        our_nicks = self._muc.our_nicks
+        for chat in self._muc.get_joined_rooms():
             chat_alias = chat   # TODO: use something else as alias?
-            nick = self.plugin['xep_0045'].our_nicks[chat]
-            self.account.receive_msg(Message.chat_list(
-                self.account, chat, chat_alias, nick))
+            nick = our_nicks[chat]
+            account.receive_msg(Message.chat_list(
+                account, chat, chat_alias, nick))
 
     async def _chat_join(self, chat: str) -> None:
         """
@@ -323,7 +373,7 @@ class BackendClient(ClientXMPP):
         nick = self.boundjid.bare
         try:
             # if a room password is needed, use: password=the_room_password
-            await self.plugin['xep_0045'].join_muc_wait(chat, nick)
+            await self._muc.join_muc_wait(chat, nick)
         except PresenceError as ex:
             logging.error(ex)
             msg = Message.chat_msg(self.account,
@@ -334,7 +384,7 @@ class BackendClient(ClientXMPP):
             self.account.receive_msg(msg)
         self.add_event_handler(f"muc::{chat}::got_online", self.muc_online)
         self.add_event_handler(f"muc::{chat}::got_offline", self.muc_offline)
-        self.muc_cache.append(chat)
+        self.muc_cache.add(chat)
 
     def _chat_part(self, chat: str) -> None:
         """
@@ -342,9 +392,9 @@ class BackendClient(ClientXMPP):
         """
 
         # chat already joined
-        if chat in self.plugin['xep_0045'].get_joined_rooms():
-            nick = self.plugin['xep_0045'].our_nicks[chat]
-            self.plugin['xep_0045'].leave_muc(chat, nick)
+        if chat in self._muc.get_joined_rooms():
+            nick = self._muc.our_nicks[chat]
+            self._muc.leave_muc(chat, nick)
             self.del_event_handler(f"muc::{chat}::got_online",
                                    self.muc_online)
             self.del_event_handler(f"muc::{chat}::got_offline",
@@ -361,23 +411,22 @@ class BackendClient(ClientXMPP):
         Get list of users in chat on account
         """
 
-        roster = self.plugin['xep_0045'].get_roster(chat)
+        roster = self._muc.get_roster(chat)
         if not roster:
             return
 
-        for user in roster:
-            if user == "":
-                continue
+        # TODO: try to retrieve user's presence as status?
+        status = "join"
+        account = self.account
+        for user in filter(None, roster):
             # TODO: try to retrieve proper alias
             user_alias = user
-            # TODO: try to retrieve user's presence as status?
-            status = "join"
-            self.account.receive_msg(Message.chat_user(
-                self.account, chat, user, user_alias, status))
+            account.receive_msg(Message.chat_user(
+                account, chat, user, user_alias, status))
 
     def _chat_invite(self, chat: str, user: str) -> None:
         """
         Invite user to chat on account
         """
 
-        self.plugin['xep_0045'].invite(chat, user)
+        self._muc.invite(chat, user)
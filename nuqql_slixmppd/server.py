@@ -27,6 +27,9 @@ if TYPE_CHECKING:   # imports for typing
 # slixmppd version
 VERSION = "0.8.4"
 
+# line breaks in html-escaped messages from nuqql
+BR_RE = re.compile("<br/>", re.IGNORECASE)
+
 
 class BackendServer:
     """
@@ -77,9 +80,8 @@ class BackendServer:
         """
 
         assert account
-        try:
-            xmpp = self.connections[account.aid]
-        except KeyError:
+        xmpp = self.connections.get(account.aid)
+        if xmpp is None:
             # no active connection
             return ""
 
@@ -105,7 +107,7 @@ class BackendServer:
         # later
         html_msg = f'<body xmlns="http://www.w3.org/1999/xhtml">{msg}</body>'
         msg = html.unescape(msg)
-        msg = "\n".join(re.split("<br/>", msg, flags=re.IGNORECASE))
+        msg = BR_RE.sub("\n", msg)
 
         # send message
         await self.handle_command(account, cmd, (dest, msg, html_msg,
@@ -131,12 +133,6 @@ class BackendServer:
         # start client connection
         assert account
         xmpp = BackendClient(account)
-        xmpp.register_plugin('xep_0071')    # XHTML-IM
-        xmpp.register_plugin('xep_0082')    # XMPP Date and Time Profiles
-        xmpp.register_plugin('xep_0203')    # Delayed Delivery, time stamps
-        xmpp.register_plugin('xep_0030')    # Service Discovery
-        xmpp.register_plugin('xep_0045')    # Multi-User Chat
-        xmpp.register_plugin('xep_0199')    # XMPP Ping
         xmpp.connect()
 
         # save client connection in active connections dictionary
@@ -145,8 +141,8 @@ class BackendServer:
     async def add_account(self, account: Optional["Account"], _cmd: Callback,
                           _params: Tuple) -> str:
         """
-        Add a new account (from based) and run a new slixmpp client thread for
-        it
+        Add a new account (from based) and run a new slixmpp client for it on
+        the shared event loop
         """
 
         # only handle xmpp accounts
@@ -154,7 +150,7 @@ class BackendServer:
         if account.type != "xmpp":
             return ""
 
-        # create and start thread
+        # create and start client
         await self.run_client(account)
 
         return ""
@@ -163,7 +159,7 @@ class BackendServer:
                           _params: Tuple) -> str:
         """
         Delete an existing account (in based) and
-        stop slixmpp client thread for it
+        stop slixmpp client for it
         """
 
         # stop client